@@ -3,7 +3,9 @@ streamingdata_consumer_uma.py
 
 Consume json messages from a Kafka topic and visualize author counts in real-time.
 Example Kafka message format:
-{'timestamp': '2025-02-23T02:28:34.746539', 
+{'source': 'producer:Food-Nutrients.csv',
+'seq': 1,
+'timestamp': '2025-02-23T02:28:34.746539', 
 'Food': 'Apple, commercial, 2 crust (23cm diam)', 
 'Calories': '296', 
 'Protein': '2', 
@@ -19,7 +21,7 @@ Example Kafka message format:
 
 # Import packages from Python Standard Library
 import os
-import json  # handle JSON parsing
+import json  # serialize dead letters and results
 
 # Use a deque ("deck") - a double-ended queue data structure
 # A deque is a good way to monitor a certain number of "most recent" messages
@@ -28,6 +30,7 @@ from collections import deque
 
 # Import external packages
 from dotenv import load_dotenv
+import numpy as np
 
 # IMPORTANT
 # Import Matplotlib.pyplot for live plotting
@@ -37,6 +40,23 @@ import matplotlib.pyplot as plt
 
 # Import functions from local modules
 from utils.utils_consumer import create_kafka_consumer
+from utils.utils_producer import create_kafka_producer
+from utils.utils_downsample import MultiResolutionSeries
+from utils.utils_dedup import (
+    RotatingBloomFilter,
+    fingerprint_record,
+    create_dedup_filter,
+)
+from utils.utils_microbatch import (
+    MicroBatch,
+    poll_batches,
+    decode_batch,
+    run_transforms,
+    publish_results,
+    DEFAULT_BATCH_MAX_RECORDS,
+    DEFAULT_BATCH_MAX_MILLIS,
+)
+from utils.utils_schema import get_validator, DeadLetterQueue, create_dead_letter_queue
 from utils.utils_logger import logger
 
 #####################################
@@ -77,12 +97,59 @@ def get_rolling_window_size() -> int:
     return window_size
 
 
+def get_max_plot_points() -> int:
+    """Fetch max points to plot from environment (0 = chart width in pixels)."""
+    max_points = int(os.getenv("SMOKER_MAX_PLOT_POINTS", 0))
+    logger.info(f"Max plot points: {max_points or 'chart width'}")
+    return max_points
+
+
+def get_microbatch_enabled() -> bool:
+    """Fetch whether to process messages in vectorized micro-batches from environment."""
+    enabled = os.getenv("SMOKER_MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+    logger.info(f"Micro-batch processing enabled: {enabled}")
+    return enabled
+
+
+def get_batch_max_records() -> int:
+    """Fetch max messages per micro-batch from environment or use default."""
+    max_records = int(os.getenv("SMOKER_BATCH_MAX_RECORDS", DEFAULT_BATCH_MAX_RECORDS))
+    logger.info(f"Micro-batch max records: {max_records}")
+    return max_records
+
+
+def get_results_topic(topic: str) -> str:
+    """Fetch the topic for per-record micro-batch results from environment or use '<topic>_results'."""
+    results_topic = os.getenv("SMOKER_RESULTS_TOPIC") or f"{topic}_results"
+    logger.info(f"Micro-batch results topic: {results_topic}")
+    return results_topic
+
+
+def get_batch_max_millis() -> int:
+    """Fetch max milliseconds to gather a micro-batch from environment or use default."""
+    max_millis = int(os.getenv("SMOKER_BATCH_MAX_MILLIS", DEFAULT_BATCH_MAX_MILLIS))
+    logger.info(f"Micro-batch max milliseconds: {max_millis}")
+    return max_millis
+
+
 #####################################
 # Set up data structures (empty lists)
 #####################################
 
-foods = []  # To store food for the x-axis
-proteins = []  # To store proteins for the y-axis
+foods = []  # To store food names, indexed by x position
+
+# Store (index, protein) points with coarser min/max levels so that
+# long runs are drawn from about one point per pixel
+proteins = MultiResolutionSeries()
+
+# Number of food names to show as x-axis tick labels
+MAX_X_TICK_LABELS = 10
+
+# Compiled once; counts accepted and rejected messages
+food_validator = get_validator("food")
+
+# State that stateful micro-batch transforms carry from batch to batch
+transform_state = {}
 
 #####################################
 # Set up live visuals
@@ -107,18 +174,38 @@ plt.ion()
 #####################################
 
 
-def update_chart(rolling_window, window_size):
+def get_chart_pixel_width() -> int:
+    """Return the width of the chart axes in pixels."""
+    bbox = ax.get_window_extent()
+    return max(int(bbox.width), 1)
+
+
+def update_chart(rolling_window, window_size, max_points: int = 0):
     """
     Update the live chart with new data.
+
+    The protein series is downsampled to the chart width (or max_points)
+    with min/max decimation, so peaks stay visible however long the run.
     """
     # Clear the previous chart
     ax.clear()  
 
+    # Downsample to the pixel width so render time stays flat
+    points = proteins.query(max_points or get_chart_pixel_width())
+    x_values = [x for x, _ in points]
+    y_values = [y for _, y in points]
+
     # Create a line chart using the plot() method
-    # Use the timestamps for the x-axis and temperatures for the y-axis
+    # Use the food position for the x-axis and proteins for the y-axis
     # Use the label parameter to add a legend entry
     # Use the color parameter to set the line color
-    ax.plot(foods, proteins, label="Proteins", color="blue")
+    ax.plot(x_values, y_values, label="Proteins", color="blue")
+
+    # Label a few evenly spaced points with their food names
+    step = max(len(points) // MAX_X_TICK_LABELS, 1)
+    tick_positions = x_values[::step]
+    ax.set_xticks(tick_positions)
+    ax.set_xticklabels([foods[int(x)] for x in tick_positions])
 
     # Use the built-in axes methods to set the labels and title
     ax.set_xlabel("Food")
@@ -150,44 +237,133 @@ def update_chart(rolling_window, window_size):
 # #####################################
 
 
-def process_message(message: str, rolling_window: deque, window_size: int) -> None:
+def process_message(
+    message: str,
+    rolling_window: deque,
+    window_size: int,
+    max_points: int = 0,
+    dedup_filter: RotatingBloomFilter = None,
+    dead_letters: DeadLetterQueue = None,
+) -> None:
     """
     Process a single JSON message from Kafka.
+
+    Messages that fail the food schema are sent to dead_letters (if given).
+    If a dedup_filter is given, messages already seen are dropped.
     """
     try:
         # Log the raw message for debugging
         logger.debug(f"Raw message: {message}")
 
-        # Parse the JSON string into a Python dictionary
-        data: dict = json.loads(message)
-        food_list = data.get("Food")
-        food = food_list.split(",")[0]
-        protein = data.get("Protein")
+        # Parse, check and coerce the message with the compiled food schema.
+        # Rejects go to the dead-letter queue with a reason code, not the log.
+        data, reason = food_validator.validate_json(message)
+        if data is None:
+            if dead_letters is not None:
+                dead_letters.add(message, reason)
+            return
+
+        # Drop duplicates before they reach the aggregates or the chart
+        if dedup_filter is not None and dedup_filter.check_and_add(
+            fingerprint_record(data, message)
+        ):
+            logger.debug(f"Dropped duplicate message: {message}")
+            return
+
+        food = data["Food"].split(",")[0]
+        protein = data["Protein"]
         logger.info(f"Processed JSON message: {data}")
 
-        # Ensure the required fields are present
-        if food is None or protein is None:
-            logger.error(f"Invalid message format: {message}")
+        # Some foods have no protein value; there is nothing to plot
+        if protein is None:
+            logger.debug(f"No protein value for food: {food}")
             return
 
         # Append the message to the rolling window
         rolling_window.append(food)
 
-        # Append the message to the rolling window
+        # Append the food name and its (position, protein) point
+        proteins.append(len(foods), protein)
         foods.append(food)
-        proteins.append(protein)
 
         # Update chart after processing this message
-        update_chart(rolling_window=rolling_window, window_size=window_size)
+        update_chart(
+            rolling_window=rolling_window,
+            window_size=window_size,
+            max_points=max_points,
+        )
 
        
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decoding error for message '{message}': {e}")
     except Exception as e:
         logger.error(f"Error processing message '{message}': {e}")
 
 
+#####################################
+# Function to process a micro-batch of messages
+#####################################
+
+
+def process_batch(
+    messages: list,
+    rolling_window: deque,
+    window_size: int,
+    max_points: int = 0,
+    dedup_filter: RotatingBloomFilter = None,
+    dead_letters: DeadLetterQueue = None,
+) -> MicroBatch:
+    """
+    Process a micro-batch of JSON messages from Kafka.
+
+    The messages are decoded into NumPy columns, the registered
+    vectorized transforms run once over the whole batch, and the
+    chart is redrawn once per batch instead of once per message.
+
+    Returns:
+        MicroBatch: The decoded batch with its transform results in
+            batch.results, or None if nothing was accepted or it failed.
+    """
+    try:
+        batch = decode_batch(messages, food_validator, dedup_filter)
+        if dead_letters is not None:
+            for message, reason in batch.rejects:
+                dead_letters.add(message, reason)
+        if not batch.records:
+            return None
+
+        results = run_transforms(batch, state=transform_state)
+
+        # Plot only foods with a protein value
+        protein = batch.columns["Protein"]
+        plotted = np.flatnonzero(~np.isnan(protein))
+        names = [batch.records[i]["Food"].split(",")[0] for i in plotted]
+        proteins.extend(zip(range(len(foods), len(foods) + len(names)), protein[plotted].tolist()))
+        rolling_window.extend(names)
+        foods.extend(names)
+
+        # Food records always carry Protein and Calories, so both transforms ran
+        high_protein_count = int(np.count_nonzero(results["high_protein"]))
+        ratio = results["protein_calorie_ratio"]
+        mean_ratio = np.nanmean(ratio) if np.any(np.isfinite(ratio)) else float("nan")
+        logger.info(
+            f"Processed batch of {len(batch)} messages: {high_protein_count} high protein, "
+            f"mean protein share of calories {mean_ratio:.1%}, "
+            f"{len(batch.rejects)} rejected, {batch.duplicates} duplicates."
+        )
+
+        # Update chart once for the whole batch
+        update_chart(
+            rolling_window=rolling_window,
+            window_size=window_size,
+            max_points=max_points,
+        )
+        return batch
+
+    except Exception as e:
+        logger.error(f"Error processing batch of {len(messages)} messages: {e}")
+        return None
+
+
 #####################################
 # Define main function for this module
 #####################################
@@ -199,18 +375,27 @@ def main() -> None:
 
     - Reads the Kafka topic name and consumer group ID from environment variables.
     - Creates a Kafka consumer using the `create_kafka_consumer` utility.
-    - Polls messages and updates a live chart.
+    - Polls messages (one at a time, or in micro-batches) and updates a live chart.
     """
     logger.info("START consumer.")
 
     # Clear previous run's data
     foods.clear()
     proteins.clear()
+    transform_state.clear()
 
     # fetch .env content
     topic = get_kafka_topic()
     group_id = get_kafka_consumer_group_id()
     window_size = get_rolling_window_size()
+    max_points = get_max_plot_points()
+    dedup_filter = create_dedup_filter()
+    # One JSON producer sends both dead letters and micro-batch results
+    producer = create_kafka_producer(
+        value_serializer=lambda x: json.dumps(x).encode("utf-8")
+    )
+    dead_letters = create_dead_letter_queue(topic, producer)
+    microbatch_enabled = get_microbatch_enabled()
     logger.info(f"Consumer: Topic '{topic}' and group '{group_id}'...")
     logger.info(f"Rolling window size: {window_size}")
     rolling_window = deque(maxlen=window_size)
@@ -221,15 +406,48 @@ def main() -> None:
     # Poll and process messages
     logger.info(f"Polling messages from topic '{topic}'...")
     try:
-        for message in consumer:
-            message_str = message.value
-            logger.debug(f"Received message at offset {message.offset}: {message_str}")
-            process_message(message_str, rolling_window, window_size)
+        if microbatch_enabled:
+            # Gather up to N messages or T milliseconds, then process them together
+            results_topic = get_results_topic(topic)
+            for messages in poll_batches(
+                consumer, get_batch_max_records(), get_batch_max_millis()
+            ):
+                batch = process_batch(
+                    messages,
+                    rolling_window,
+                    window_size,
+                    max_points,
+                    dedup_filter,
+                    dead_letters,
+                )
+                # Send each food's transform results (ratio, z-score, ...) downstream
+                if batch is not None and producer:
+                    publish_results(producer, results_topic, batch, ("source", "seq", "Food"))
+                dead_letters.flush_if_due()
+        else:
+            for message in consumer:
+                message_str = message.value
+                logger.debug(f"Received message at offset {message.offset}: {message_str}")
+                process_message(
+                    message_str,
+                    rolling_window,
+                    window_size,
+                    max_points,
+                    dedup_filter,
+                    dead_letters,
+                )
+                dead_letters.flush_if_due()
     except KeyboardInterrupt:
         logger.warning("Consumer interrupted by user.")
     except Exception as e:
         logger.error(f"Error while consuming messages: {e}")
     finally:
+        if dedup_filter is not None:
+            logger.info(f"Duplicate messages dropped: {dedup_filter.duplicates}")
+        food_validator.log_counters()
+        dead_letters.flush()
+        if producer:
+            producer.close()
         consumer.close()
         logger.info(f"Kafka consumer for topic '{topic}' closed.")
 
@@ -0,0 +1,233 @@
+"""
+streamingdata_dashboard_uma.py
+
+Consume json messages from a Kafka topic once and serve live aggregates
+to any number of browser viewers.
+
+A single Kafka consumer keeps the aggregates and pushes compact deltas
+to every connected browser over Server-Sent Events, so adding viewers
+does not add broker load or matplotlib windows.
+
+Open http://127.0.0.1:8050/ (or DASHBOARD_HOST:DASHBOARD_PORT) to view.
+
+Example delta sent to the browser:
+{'stats': {'messages': 42, 'avg_protein': 6.3},
+'foods': {'Apple': 4.0}}
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+
+# Import external packages
+from dotenv import load_dotenv
+
+# Import functions from local modules
+from utils.utils_consumer import create_kafka_consumer
+from utils.utils_dashboard import (
+    DashboardBroadcaster,
+    start_dashboard_server,
+    DEFAULT_DASHBOARD_HOST,
+    DEFAULT_DASHBOARD_PORT,
+    DEFAULT_CLIENT_FLUSH_INTERVAL,
+)
+from utils.utils_dedup import (
+    RotatingBloomFilter,
+    fingerprint_record,
+    create_dedup_filter,
+)
+from utils.utils_schema import get_validator, DeadLetterQueue, create_dead_letter_queue
+from utils.utils_logger import logger
+
+#####################################
+# Load Environment Variables
+#####################################
+
+load_dotenv()
+
+#####################################
+# Getter Functions for .env Variables
+#####################################
+
+
+def get_kafka_topic() -> str:
+    """Fetch Kafka topic from environment or use default."""
+    topic = os.getenv("SMOKER_TOPIC", "unknown_topic")
+    logger.info(f"Kafka topic: {topic}")
+    return topic
+
+
+def get_kafka_consumer_group_id() -> str:
+    """Fetch Kafka consumer group id from environment or use default."""
+    group_id: str = os.getenv("DASHBOARD_CONSUMER_GROUP_ID", "dashboard_group")
+    logger.info(f"Kafka consumer group id: {group_id}")
+    return group_id
+
+
+def get_dashboard_host() -> str:
+    """Fetch dashboard host from environment or use default."""
+    host = os.getenv("DASHBOARD_HOST", DEFAULT_DASHBOARD_HOST)
+    logger.info(f"Dashboard host: {host}")
+    return host
+
+
+def get_dashboard_port() -> int:
+    """Fetch dashboard port from environment or use default."""
+    port = int(os.getenv("DASHBOARD_PORT", DEFAULT_DASHBOARD_PORT))
+    logger.info(f"Dashboard port: {port}")
+    return port
+
+
+def get_client_flush_interval() -> float:
+    """Fetch minimum seconds between updates per viewer from environment or use default."""
+    interval = float(os.getenv("DASHBOARD_FLUSH_INTERVAL_SECONDS", DEFAULT_CLIENT_FLUSH_INTERVAL))
+    logger.info(f"Dashboard flush interval: {interval} seconds")
+    return interval
+
+
+#####################################
+# Set up aggregates
+#####################################
+
+aggregates = {
+    "messages": 0,
+    "protein_total": 0.0,
+    "max_protein": None,
+    "max_protein_food": None,
+}
+food_proteins = {}  # To store total protein per food
+
+# Compiled once; counts accepted and rejected messages
+food_validator = get_validator("food")
+
+#####################################
+# Function to process a single message
+#####################################
+
+
+def process_message(
+    message: str,
+    broadcaster: DashboardBroadcaster,
+    dedup_filter: RotatingBloomFilter = None,
+    dead_letters: DeadLetterQueue = None,
+) -> None:
+    """
+    Process a single JSON message from Kafka and publish the changed aggregates.
+
+    Messages that fail the food schema are sent to dead_letters (if given)
+    and counted on the dashboard.
+    If a dedup_filter is given, messages already seen are dropped.
+    """
+    try:
+        # Parse, check and coerce the message with the compiled food schema.
+        # Rejects go to the dead-letter queue with a reason code, not the log.
+        data, reason = food_validator.validate_json(message)
+        if data is None:
+            if dead_letters is not None:
+                dead_letters.add(message, reason)
+            broadcaster.publish({"stats": {"rejected": food_validator.rejected()}})
+            return
+
+        # Drop duplicates before they reach the aggregates
+        if dedup_filter is not None and dedup_filter.check_and_add(
+            fingerprint_record(data, message)
+        ):
+            logger.debug(f"Dropped duplicate message: {message}")
+            return
+
+        food = data["Food"].split(",")[0]
+        protein = data["Protein"]
+
+        # Some foods have no protein value; there is nothing to aggregate
+        if protein is None:
+            logger.debug(f"No protein value for food: {food}")
+            return
+
+        # Update the aggregates
+        aggregates["messages"] += 1
+        aggregates["protein_total"] += protein
+        if aggregates["max_protein"] is None or protein > aggregates["max_protein"]:
+            aggregates["max_protein"] = protein
+            aggregates["max_protein_food"] = food
+        food_proteins[food] = food_proteins.get(food, 0.0) + protein
+
+        # Publish only what changed
+        broadcaster.publish(
+            {
+                "stats": {
+                    "messages": aggregates["messages"],
+                    "avg_protein": round(aggregates["protein_total"] / aggregates["messages"], 2),
+                    "max_protein": aggregates["max_protein"],
+                    "max_protein_food": aggregates["max_protein_food"],
+                },
+                "foods": {food: round(food_proteins[food], 2)},
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error processing message '{message}': {e}")
+
+
+#####################################
+# Define main function for this module
+#####################################
+
+
+def main() -> None:
+    """
+    Main entry point for the dashboard consumer.
+
+    - Starts the local dashboard server.
+    - Creates one Kafka consumer and publishes aggregate deltas to all viewers.
+    """
+    logger.info("START dashboard consumer.")
+
+    # fetch .env content
+    topic = get_kafka_topic()
+    group_id = get_kafka_consumer_group_id()
+    dedup_filter = create_dedup_filter()
+    dead_letters = create_dead_letter_queue(topic)
+
+    broadcaster = DashboardBroadcaster()
+    server = start_dashboard_server(
+        broadcaster,
+        host=get_dashboard_host(),
+        port=get_dashboard_port(),
+        flush_interval=get_client_flush_interval(),
+    )
+
+    # Create the Kafka consumer using the helpful utility function.
+    consumer = create_kafka_consumer(topic, group_id)
+
+    # Poll and process messages
+    logger.info(f"Polling messages from topic '{topic}'...")
+    try:
+        for message in consumer:
+            process_message(message.value, broadcaster, dedup_filter, dead_letters)
+            dead_letters.flush_if_due()
+    except KeyboardInterrupt:
+        logger.warning("Dashboard consumer interrupted by user.")
+    except Exception as e:
+        logger.error(f"Error while consuming messages: {e}")
+    finally:
+        if dedup_filter is not None:
+            logger.info(f"Duplicate messages dropped: {dedup_filter.duplicates}")
+        food_validator.log_counters()
+        dead_letters.flush()
+        if dead_letters.producer:
+            dead_letters.producer.close()
+        consumer.close()
+        server.shutdown()
+        logger.info(f"Kafka consumer for topic '{topic}' and dashboard server closed.")
+
+
+#####################################
+# Conditional Execution
+#####################################
+
+# Ensures this script runs only when executed directly (not when imported as a module).
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+streamingdata_loadgen_uma.py
+
+Generate large volumes of realistic synthetic records for load tests.
+
+The sample data is small (about 1,100 food rows and 1,600 social
+messages), so this module learns value distributions from it and
+emits as many synthetic records as needed from a pool of worker
+processes:
+
+- food:   rows shaped like the producer's messages, each one a real
+          Food-Nutrients.csv row scaled as a whole (blanks kept).
+- social: messages learned from project_live.json (authors,
+          categories, keywords, message templates, sentiments).
+- smoker: temperatures learned from smoker_temps.csv (range and
+          minute-to-minute changes, replayed as a random walk).
+
+Output is deterministic for a given seed, stream, record count and
+chunk size, whatever the number of workers. Records are written as
+JSON lines to a file, or sent to a Kafka topic like the producer does.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+import sys
+import re
+import csv
+import json
+import time
+import random
+import pathlib
+import multiprocessing
+from collections import Counter, deque
+from datetime import datetime, timedelta
+
+# Import external packages
+from dotenv import load_dotenv
+
+# Import functions from local modules
+from utils.utils_producer import (
+    verify_services,
+    create_kafka_producer,
+    create_kafka_topic,
+)
+from utils.utils_logger import logger
+
+#####################################
+# Load Environment Variables
+#####################################
+
+load_dotenv()
+
+#####################################
+# Set up Paths
+#####################################
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent
+DATA_FOLDER = PROJECT_ROOT.joinpath("data")
+
+FOOD_FILE = DATA_FOLDER.joinpath("Food-Nutrients.csv")
+SOCIAL_FILE = DATA_FOLDER.joinpath("project_live.json")
+SMOKER_FILE = DATA_FOLDER.joinpath("smoker_temps.csv")
+
+STREAMS = ("food", "social", "smoker")
+
+# Topic each stream is sent to unless LOADGEN_TOPIC is set
+STREAM_TOPIC_VARIABLES = {
+    "food": "SMOKER_TOPIC",
+    "social": "PROJECT_TOPIC",
+    "smoker": "LOADGEN_SMOKER_TOPIC",
+}
+
+# Synthetic timestamps start here and advance one interval per record
+BASE_TIMESTAMP = datetime(2025, 1, 1)
+RECORD_INTERVAL = timedelta(milliseconds=10)
+
+NUTRIENT_COLUMNS = ("Calories", "Protein", "Fat", "Carbs", "Fibre")
+
+MESSAGE_PATTERN = re.compile(r"^I just (\w+) (.+)! It was (\w+)\.$")
+
+#####################################
+# Getter Functions for .env Variables
+#####################################
+
+
+def get_stream() -> str:
+    """Fetch which stream to generate from environment or use default."""
+    stream = os.getenv("LOADGEN_STREAM", "food")
+    if stream not in STREAMS:
+        logger.error(f"Unknown LOADGEN_STREAM '{stream}'. Use one of {STREAMS}. Exiting.")
+        sys.exit(1)
+    logger.info(f"Load generator stream: {stream}")
+    return stream
+
+
+def get_record_count() -> int:
+    """Fetch number of records to generate from environment or use default."""
+    count = int(os.getenv("LOADGEN_RECORDS", 1_000_000))
+    logger.info(f"Records to generate: {count}")
+    return count
+
+
+def get_worker_count() -> int:
+    """Fetch number of worker processes from environment or use the CPU count."""
+    workers = int(os.getenv("LOADGEN_WORKERS", 0)) or os.cpu_count() or 1
+    logger.info(f"Worker processes: {workers}")
+    return workers
+
+
+def get_chunk_size() -> int:
+    """Fetch records per worker task from environment or use default."""
+    chunk_size = int(os.getenv("LOADGEN_CHUNK_SIZE", 10_000))
+    logger.info(f"Chunk size: {chunk_size}")
+    return chunk_size
+
+
+def get_seed() -> int:
+    """Fetch random seed from environment or use default."""
+    seed = int(os.getenv("LOADGEN_SEED", 42))
+    logger.info(f"Seed: {seed}")
+    return seed
+
+
+def get_output() -> str:
+    """Fetch output target (file or kafka) from environment or use default."""
+    output = os.getenv("LOADGEN_OUTPUT", "file")
+    if output not in ("file", "kafka"):
+        logger.error(f"Unknown LOADGEN_OUTPUT '{output}'. Use 'file' or 'kafka'. Exiting.")
+        sys.exit(1)
+    logger.info(f"Output: {output}")
+    return output
+
+
+def get_output_file(stream: str) -> pathlib.Path:
+    """Fetch output file from environment or use a default per stream."""
+    default = DATA_FOLDER.joinpath(f"synthetic_{stream}.jsonl")
+    output_file = pathlib.Path(os.getenv("LOADGEN_OUTPUT_FILE", default))
+    logger.info(f"Output file: {output_file}")
+    return output_file
+
+
+def get_kafka_topic(stream: str) -> str:
+    """Fetch Kafka topic from environment or use the stream's usual topic."""
+    topic = os.getenv("LOADGEN_TOPIC") or os.getenv(
+        STREAM_TOPIC_VARIABLES[stream], f"synthetic_{stream}"
+    )
+    logger.info(f"Kafka topic: {topic}")
+    return topic
+
+
+#####################################
+# Learn Distributions from Sample Data
+#####################################
+
+
+def learn_food_profile(file_path: pathlib.Path) -> dict:
+    """
+    Learn the food rows (name and nutrient values) from the food CSV.
+
+    Whole rows are kept, so a synthetic record is always based on one
+    real food and its nutrients stay consistent with each other (e.g.
+    protein never supplies more energy than the calories allow).
+    Sampling rows uniformly keeps the food mix of the CSV; categories
+    are not sent, as the producer does not send them either.
+    """
+    with open(file_path, "r", encoding="utf-8-sig") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+
+    foods = [
+        (
+            row["Food Item"],
+            tuple(float(row[column]) if row[column] else None for column in NUTRIENT_COLUMNS),
+        )
+        for row in rows
+    ]
+
+    logger.info(f"Learned food profile: {len(foods)} rows.")
+    return {"foods": foods}
+
+
+def learn_social_profile(file_path: pathlib.Path) -> dict:
+    """Learn authors, categories, keywords, message parts and sentiments from the JSON lines."""
+    with open(file_path, "r") as json_file:
+        records = [json.loads(line) for line in json_file if line.strip()]
+
+    author_counts = Counter(record["author"] for record in records)
+    category_counts = Counter(record["category"] for record in records)
+    categories = {}
+    verbs = Counter()
+    adjectives = Counter()
+    for category in category_counts:
+        category_records = [record for record in records if record["category"] == category]
+        subjects = Counter()
+        for record in category_records:
+            match = MESSAGE_PATTERN.match(record["message"])
+            if match:
+                verbs[match.group(1)] += 1
+                subjects[(match.group(2), record["keyword_mentioned"])] += 1
+                adjectives[match.group(3)] += 1
+        categories[category] = {
+            "subjects": list(subjects),
+            "subject_weights": list(subjects.values()),
+            "sentiments": [record["sentiment"] for record in category_records],
+        }
+
+    logger.info(f"Learned social profile: {len(records)} messages, {len(categories)} categories.")
+    return {
+        "authors": list(author_counts),
+        "author_weights": list(author_counts.values()),
+        "category_names": list(category_counts),
+        "category_weights": list(category_counts.values()),
+        "categories": categories,
+        "verbs": list(verbs),
+        "verb_weights": list(verbs.values()),
+        "adjectives": list(adjectives),
+        "adjective_weights": list(adjectives.values()),
+    }
+
+
+def learn_smoker_profile(file_path: pathlib.Path) -> dict:
+    """Learn the temperature range and minute-to-minute changes from the smoker CSV."""
+    with open(file_path, "r") as csv_file:
+        temperatures = [float(row["temperature"]) for row in csv.DictReader(csv_file)]
+
+    steps = [b - a for a, b in zip(temperatures, temperatures[1:])]
+    logger.info(f"Learned smoker profile: {len(temperatures)} readings.")
+    return {
+        "start": temperatures[0],
+        "min": min(temperatures),
+        "max": max(temperatures),
+        "steps": steps,
+    }
+
+
+PROFILE_LEARNERS = {
+    "food": (learn_food_profile, FOOD_FILE),
+    "social": (learn_social_profile, SOCIAL_FILE),
+    "smoker": (learn_smoker_profile, SMOKER_FILE),
+}
+
+#####################################
+# Record Generators
+#####################################
+
+
+def generate_food_record(rng: random.Random, profile: dict, index: int) -> dict:
+    """Generate one message shaped like the food producer's messages."""
+    food, values = rng.choice(profile["foods"])
+    record = {
+        "source": profile["source"],
+        "seq": index + 1,
+        "timestamp": (BASE_TIMESTAMP + index * RECORD_INTERVAL).isoformat(),
+        "Food": food,
+    }
+    # Scale the whole row by one factor (a bigger or smaller portion),
+    # so values are not just copies but keep their proportions.
+    # Blanks in the source row stay blank.
+    scale = rng.uniform(0.85, 1.15)
+    for column, value in zip(NUTRIENT_COLUMNS, values):
+        if value is None:
+            record[column] = ""
+        elif column == "Calories":
+            record[column] = str(round(value * scale))
+        else:
+            record[column] = str(round(value * scale, 1))
+    return record
+
+
+def generate_social_record(rng: random.Random, profile: dict, index: int) -> dict:
+    """Generate one message shaped like project_live.json."""
+    category = rng.choices(profile["category_names"], profile["category_weights"])[0]
+    learned = profile["categories"][category]
+    subject, keyword = rng.choices(learned["subjects"], learned["subject_weights"])[0]
+    verb = rng.choices(profile["verbs"], profile["verb_weights"])[0]
+    adjective = rng.choices(profile["adjectives"], profile["adjective_weights"])[0]
+    message = f"I just {verb} {subject}! It was {adjective}."
+    return {
+        "message": message,
+        "author": rng.choices(profile["authors"], profile["author_weights"])[0],
+        "timestamp": (BASE_TIMESTAMP + index * RECORD_INTERVAL).strftime("%Y-%m-%d %H:%M:%S"),
+        "category": category,
+        "sentiment": rng.choice(learned["sentiments"]),
+        "keyword_mentioned": keyword,
+        "message_length": len(message),
+    }
+
+
+RECORD_GENERATORS = {
+    "food": generate_food_record,
+    "social": generate_social_record,
+}
+
+
+def generate_smoker_records(rng: random.Random, profile: dict, start_index: int, count: int) -> list:
+    """Generate a run of temperatures as a random walk over the learned steps."""
+    # Each chunk starts from its own point in the learned range so chunks are independent
+    temperature = rng.uniform(profile["min"], profile["max"])
+    records = []
+    for index in range(start_index, start_index + count):
+        temperature = min(max(temperature + rng.choice(profile["steps"]), profile["min"]), profile["max"])
+        records.append(
+            {
+                "timestamp": (BASE_TIMESTAMP + index * RECORD_INTERVAL).isoformat(),
+                "temperature": round(temperature, 1),
+            }
+        )
+    return records
+
+
+#####################################
+# Worker Processes
+#####################################
+
+# Set once per worker process by init_worker()
+_worker_profile = None
+
+
+def init_worker(profile: dict) -> None:
+    """Store the learned profile in the worker process."""
+    global _worker_profile
+    _worker_profile = profile
+
+
+def generate_chunk(task: tuple) -> bytes:
+    """
+    Generate one chunk of records as JSON lines.
+
+    The chunk is seeded from (seed, stream, chunk index), so its content
+    does not depend on which worker runs it.
+    """
+    stream, seed, chunk_index, start_index, count = task
+    rng = random.Random(f"{seed}:{stream}:{chunk_index}")
+    if stream == "smoker":
+        records = generate_smoker_records(rng, _worker_profile, start_index, count)
+    else:
+        generate_record = RECORD_GENERATORS[stream]
+        records = [
+            generate_record(rng, _worker_profile, index)
+            for index in range(start_index, start_index + count)
+        ]
+    return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+
+def generate_chunks(stream: str, record_count: int, chunk_size: int, seed: int, workers: int):
+    """
+    Generate all records on a pool of worker processes.
+
+    Chunks are submitted as earlier ones are consumed, so memory stays
+    bounded at a few chunks per worker however many records are asked for.
+
+    Yields:
+        bytes: JSON lines for one chunk, in chunk order.
+    """
+    learn_profile, source_file = PROFILE_LEARNERS[stream]
+    profile = learn_profile(source_file)
+
+    # Records from different seeds differ, so each seed is its own source
+    # of seq numbers (and never collides with the file producer's)
+    profile["source"] = f"loadgen:{stream}:{seed}"
+
+    tasks = (
+        (stream, seed, chunk_index, start_index, min(chunk_size, record_count - start_index))
+        for chunk_index, start_index in enumerate(range(0, record_count, chunk_size))
+    )
+    # Keep at most two chunks per worker in flight, so workers wait for a
+    # slow sink (e.g. a full Kafka send buffer) instead of piling up chunks
+    max_in_flight = 2 * workers
+    pending = deque()
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(profile,)) as pool:
+        for task in tasks:
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(generate_chunk, (task,)))
+        while pending:
+            yield pending.popleft().get()
+
+
+#####################################
+# Define main function for this module.
+#####################################
+
+
+def main():
+    """
+    Main entry point for the load generator.
+
+    - Learns the value distributions of the chosen stream.
+    - Generates records on a pool of worker processes.
+    - Writes them to a JSON lines file or sends them to Kafka.
+    """
+    logger.info("START load generator.")
+
+    # fetch .env content
+    stream = get_stream()
+    record_count = get_record_count()
+    workers = get_worker_count()
+    chunk_size = get_chunk_size()
+    seed = get_seed()
+    output = get_output()
+
+    producer = None
+    output_file = None
+    if output == "kafka":
+        verify_services()
+        topic = get_kafka_topic(stream)
+        producer = create_kafka_producer(value_serializer=lambda x: x)
+        if not producer:
+            logger.error("Failed to create Kafka producer. Exiting...")
+            sys.exit(3)
+        create_kafka_topic(topic)
+    else:
+        output_file = open(get_output_file(stream), "wb")
+
+    start = time.perf_counter()
+    sent = 0
+    try:
+        for chunk in generate_chunks(stream, record_count, chunk_size, seed, workers):
+            if producer:
+                for line in chunk.splitlines():
+                    producer.send(topic, value=line)
+            else:
+                output_file.write(chunk)
+            sent += chunk.count(b"\n")
+    except KeyboardInterrupt:
+        logger.warning("Load generator interrupted by user.")
+    finally:
+        if producer:
+            producer.flush()
+            producer.close()
+        if output_file:
+            output_file.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Generated {sent} {stream} records in {elapsed:.1f} seconds "
+        f"({sent / max(elapsed, 1e-9) * 60:,.0f} records per minute)."
+    )
+    logger.info("END load generator.")
+
+
+#####################################
+# Conditional Execution
+#####################################
+
+if __name__ == "__main__":
+    main()
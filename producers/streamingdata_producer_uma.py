@@ -15,6 +15,7 @@ each field is clearly labeled.
 import os
 import sys
 import time  # control message intervals
+import threading  # flag a failed send from the producer's I/O thread
 import pathlib  # work with file paths
 import csv  # handle CSV data
 import json  # work with JSON data
@@ -29,6 +30,13 @@ from utils.utils_producer import (
     create_kafka_producer,
     create_kafka_topic,
 )
+from utils.utils_checkpoint import (
+    save_checkpoint,
+    load_checkpoint,
+    clear_checkpoint,
+    AckTracker,
+)
+from utils.utils_schema import get_validator, create_dead_letter_queue
 from utils.utils_logger import logger
 
 #####################################
@@ -56,6 +64,20 @@ def get_message_interval() -> int:
     return interval
 
 
+def get_clear_topic() -> bool:
+    """Fetch whether to clear the topic on start (opt-in) from environment."""
+    clear_topic = os.getenv("SMOKER_CLEAR_TOPIC", "false").lower() in ("1", "true", "yes")
+    logger.info(f"Clear topic on start: {clear_topic}")
+    return clear_topic
+
+
+def get_checkpoint_every() -> int:
+    """Fetch how many acknowledged rows between checkpoints from environment or use default."""
+    every = int(os.getenv("SMOKER_CHECKPOINT_EVERY", 100))
+    logger.info(f"Checkpoint every: {every} rows")
+    return every
+
+
 #####################################
 # Set up Paths
 #####################################
@@ -73,48 +95,77 @@ logger.info(f"Data folder: {DATA_FOLDER}")
 DATA_FILE = DATA_FOLDER.joinpath("Food-Nutrients.csv")
 logger.info(f"Data file: {DATA_FILE}")
 
+# Identify this producer's records; seq (the row number) is unique only within a source
+SOURCE_ID = f"producer:{DATA_FILE.name}"
+
+# Set the name of the checkpoint file used to resume after an interruption
+CHECKPOINT_FILE = DATA_FOLDER.joinpath("Food-Nutrients.checkpoint.json")
+logger.info(f"Checkpoint file: {CHECKPOINT_FILE}")
+
 #####################################
 # Message Generator
 #####################################
 
 
-def generate_messages(file_path: pathlib.Path):
+def generate_positioned_messages(
+    file_path: pathlib.Path, start_offset: int = 0, start_row: int = 0
+):
     """
-    Read from a csv file and yield records one by one, until the file is read.
+    Read from a csv file, starting at a byte offset, and yield records
+    with their position, until the file is read.
 
     Args:
         file_path (pathlib.Path): Path to the CSV file.
+        start_offset (int): Byte offset of the first row to read (0 = first data row).
+        start_row (int): Number of rows already sent before start_offset.
 
     Yields:
-        str: CSV row formatted as a string.
+        tuple: (message dict, byte offset just past the row, row number).
     """
     try:
-        logger.info(f"Opening data file in read mode: {DATA_FILE}")
-        with open(DATA_FILE, "r") as csv_file:
-            logger.info(f"Reading data from file: {DATA_FILE}")
-
-            csv_reader = csv.DictReader(csv_file)
+        logger.info(f"Opening data file in read mode: {file_path}")
+        with open(file_path, "rb") as csv_file:
+            logger.info(f"Reading data from file: {file_path}")
+
+            # The header is always read, then jump straight to the checkpoint
+            header = csv_file.readline().decode("utf-8-sig")
+            fieldnames = next(csv.reader([header]))
+            if start_offset > csv_file.tell():
+                csv_file.seek(start_offset)
+                logger.info(f"Skipped to byte offset {start_offset} (row {start_row}).")
+
+            # Track the byte offset of the lines handed to the csv reader
+            position = {"offset": csv_file.tell()}
+
+            def read_lines():
+                for line in iter(csv_file.readline, b""):
+                    position["offset"] = csv_file.tell()
+                    yield line.decode("utf-8")
+
+            csv_reader = csv.DictReader(read_lines(), fieldnames=fieldnames)
+            row_number = start_row
             for row in csv_reader:
-                # Ensure required fields are present
-                if "Calories" not in row:
-                    logger.error(f"Missing 'Calories' column in row: {row}")
-                    continue
+                row_number += 1
 
-                # Generate a timestamp and prepare the message
+                # Generate a timestamp and prepare the message.
+                # The source and row number identify the record for consumers
+                # that drop duplicates.
                 current_timestamp = datetime.utcnow().isoformat()
                 message = {
+                    "source": SOURCE_ID,
+                    "seq": row_number,
                     "timestamp": current_timestamp,
-                    "Food": row["Food Item"],
+                    "Food": row.get("Food Item"),
                    # "Category": row["Category"],
-                    "Calories": row["Calories"],
-                    "Protein": row["Protein"],
-                    "Fat": row["Fat"],
-                    "Carbs": row["Carbs"],
-                    "Fibre": row["Fibre"]
+                    "Calories": row.get("Calories"),
+                    "Protein": row.get("Protein"),
+                    "Fat": row.get("Fat"),
+                    "Carbs": row.get("Carbs"),
+                    "Fibre": row.get("Fibre")
                     
                 }
                 logger.debug(f"Generated message: {message}")
-                yield message
+                yield message, position["offset"], row_number
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}. Exiting.")
         sys.exit(1)
@@ -123,6 +174,20 @@ def generate_messages(file_path: pathlib.Path):
         sys.exit(3)
 
 
+def generate_messages(file_path: pathlib.Path):
+    """
+    Read from a csv file and yield records one by one, until the file is read.
+
+    Args:
+        file_path (pathlib.Path): Path to the CSV file.
+
+    Yields:
+        dict: CSV row formatted as a message.
+    """
+    for message, _, _ in generate_positioned_messages(file_path):
+        yield message
+
+
 #####################################
 # Define main function for this module.
 #####################################
@@ -143,6 +208,8 @@ def main():
     # fetch .env content
     topic = get_kafka_topic()
     interval_secs = get_message_interval()
+    clear_topic = get_clear_topic()
+    checkpoint_every = get_checkpoint_every()
 
     # Verify the data file exists
     if not DATA_FILE.exists():
@@ -157,26 +224,81 @@ def main():
         logger.error("Failed to create Kafka producer. Exiting...")
         sys.exit(3)
 
-    # Create topic if it doesn't exist
+    # Rejected rows are sent in batches to the dead-letter topic, on the same producer
+    dead_letters = create_dead_letter_queue(topic, producer)
+    dlq_topic = dead_letters.dlq_topic
+
+    # Create topic if it doesn't exist (clearing it is opt-in)
     try:
-        create_kafka_topic(topic)
-        logger.info(f"Kafka topic '{topic}' is ready.")
+        create_kafka_topic(topic, clear_existing=clear_topic)
+        create_kafka_topic(dlq_topic)
+        logger.info(f"Kafka topics '{topic}' and '{dlq_topic}' are ready.")
     except Exception as e:
         logger.error(f"Failed to create or verify topic '{topic}': {e}")
         sys.exit(1)
 
+    # A cleared topic starts over, otherwise resume after the last acknowledged row
+    if clear_topic:
+        clear_checkpoint(CHECKPOINT_FILE)
+    start_offset, start_row = load_checkpoint(CHECKPOINT_FILE, DATA_FILE, topic)
+
+    # Position after the last row that, with every row before it, the broker
+    # acknowledged. Acks arrive on the producer's I/O thread; kafka-python
+    # calls the callbacks with the bound args first. A failed send is never
+    # acknowledged, so the checkpoint stays before it and a restart resends it.
+    acked = AckTracker(start_offset, start_row)
+
+    # Stop at the first failed send: the checkpoint cannot move past it, so
+    # every row sent afterwards would only be sent again on restart.
+    send_failed = threading.Event()
+
+    def on_send_error(row_number, e):
+        logger.error(f"Failed to send row {row_number} to topic '{topic}': {e}")
+        send_failed.set()
+
+    def checkpoint():
+        byte_offset, row_number = acked.position
+        save_checkpoint(CHECKPOINT_FILE, DATA_FILE, topic, byte_offset, row_number)
+
+    # Rows are checked and coerced (e.g. "296" -> 296) by the compiled food schema.
+    # Rejected rows go to the dead-letter queue with a reason code.
+    food_validator = get_validator("food")
+
     # Generate and send messages
     logger.info(f"Starting message production to topic '{topic}'...")
     try:
-        for csv_message in generate_messages(DATA_FILE):
-            producer.send(topic, value=csv_message)
-            logger.info(f"Sent message to topic '{topic}': {csv_message}")
+        for csv_message, byte_offset, row_number in generate_positioned_messages(
+            DATA_FILE, start_offset, start_row
+        ):
+            if send_failed.is_set():
+                logger.error("Stopping after a failed send. Restart to resume from the checkpoint.")
+                break
+
+            record, reason = food_validator.validate(csv_message)
+            if record is None:
+                dead_letters.add(csv_message, reason)
+                acked.add(row_number, byte_offset, done=True)
+                continue
+
+            acked.add(row_number, byte_offset)
+            future = producer.send(topic, value=record)
+            future.add_callback(acked.acknowledge, row_number)
+            future.add_errback(on_send_error, row_number)
+            logger.info(f"Sent message to topic '{topic}': {record}")
+            if row_number % checkpoint_every == 0:
+                checkpoint()
             time.sleep(interval_secs)
     except KeyboardInterrupt:
         logger.warning("Producer interrupted by user.")
     except Exception as e:
         logger.error(f"Error during message production: {e}")
     finally:
+        dead_letters.flush()
+        food_validator.log_counters()
+
+        # Wait for outstanding sends so the final checkpoint is up to date
+        producer.flush()
+        checkpoint()
         producer.close()
         logger.info("Kafka producer closed.")
 
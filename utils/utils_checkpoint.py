@@ -0,0 +1,170 @@
+"""
+utils_checkpoint.py - save and restore producer progress.
+
+A checkpoint records how far a producer got through its source file:
+the byte offset just past the last acknowledged row and that row's
+number. On restart the producer seeks straight to the offset instead
+of re-reading and re-sending the file from the first row.
+
+Checkpoints are small JSON files written atomically (write to a
+temporary file, then rename), so an interrupted save never leaves a
+half-written checkpoint behind.
+
+AckTracker decides what position is safe to save: the last row of the
+unbroken run of acknowledged rows, so a failed send is never skipped.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+import json
+import pathlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# Import functions from local modules
+from utils.utils_logger import logger
+
+#####################################
+# Checkpoint Functions
+#####################################
+
+
+def save_checkpoint(
+    checkpoint_path: pathlib.Path,
+    source_path: pathlib.Path,
+    topic: str,
+    byte_offset: int,
+    row_number: int,
+) -> None:
+    """
+    Atomically write the producer position to a checkpoint file.
+
+    Args:
+        checkpoint_path (pathlib.Path): Where to write the checkpoint.
+        source_path (pathlib.Path): The file being streamed.
+        topic (str): The Kafka topic the rows were sent to.
+        byte_offset (int): Source offset just past the last acknowledged row.
+        row_number (int): Number of the last acknowledged row (1-based).
+    """
+    checkpoint = {
+        "source": str(source_path),
+        "topic": topic,
+        "byte_offset": byte_offset,
+        "row_number": row_number,
+        "updated": datetime.utcnow().isoformat(),
+    }
+    temp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    try:
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, checkpoint_path)
+        logger.debug(f"Checkpoint saved: {checkpoint}")
+    except OSError as e:
+        logger.error(f"Error saving checkpoint to {checkpoint_path}: {e}")
+
+
+def load_checkpoint(
+    checkpoint_path: pathlib.Path, source_path: pathlib.Path, topic: str
+) -> tuple:
+    """
+    Read the producer position from a checkpoint file.
+
+    The checkpoint is ignored when it belongs to another source or topic,
+    or when its offset is past the end of the (since truncated) source.
+
+    Returns:
+        tuple: (byte_offset, row_number), or (0, 0) to start from the beginning.
+    """
+    if not checkpoint_path.exists():
+        logger.info(f"No checkpoint at {checkpoint_path}. Starting from the first row.")
+        return 0, 0
+
+    try:
+        with open(checkpoint_path, "r") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        byte_offset = int(checkpoint["byte_offset"])
+        row_number = int(checkpoint["row_number"])
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Unreadable checkpoint {checkpoint_path}: {e}. Starting from the first row.")
+        return 0, 0
+
+    if checkpoint.get("source") != str(source_path) or checkpoint.get("topic") != topic:
+        logger.warning(
+            f"Checkpoint {checkpoint_path} is for {checkpoint.get('source')} -> "
+            f"'{checkpoint.get('topic')}'. Starting from the first row."
+        )
+        return 0, 0
+
+    if byte_offset > source_path.stat().st_size:
+        logger.warning(f"Checkpoint offset {byte_offset} is past the end of {source_path}. Starting from the first row.")
+        return 0, 0
+
+    logger.info(f"Resuming from checkpoint: row {row_number}, byte offset {byte_offset}.")
+    return byte_offset, row_number
+
+
+def clear_checkpoint(checkpoint_path: pathlib.Path) -> None:
+    """Delete a checkpoint file if it exists."""
+    try:
+        checkpoint_path.unlink()
+        logger.info(f"Checkpoint {checkpoint_path} removed.")
+    except FileNotFoundError:
+        pass
+
+
+#####################################
+# Acknowledgement Tracking
+#####################################
+
+
+class AckTracker:
+    """
+    Track the highest contiguous acknowledged row of a producer.
+
+    Rows are registered in send order. Acknowledgements may arrive on
+    another thread; the safe position only moves past a row once it and
+    every earlier row are done, so a row whose send failed holds the
+    position (and the checkpoint) before it.
+
+    Attributes:
+        position (tuple): (byte_offset, row_number) safe to checkpoint.
+            Always replaced in one assignment, so readers see a matching pair.
+    """
+
+    def __init__(self, byte_offset: int = 0, row_number: int = 0):
+        self.position = (byte_offset, row_number)
+        # row_number -> [byte_offset, done], in send order
+        self._in_flight = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, row_number: int, byte_offset: int, done: bool = False) -> None:
+        """Register a row in send order (done=True for rows that need no ack)."""
+        with self._lock:
+            self._in_flight[row_number] = [byte_offset, done]
+            self._advance()
+
+    def acknowledge(self, row_number: int, record_metadata=None) -> None:
+        """Mark a row as acknowledged (usable as a kafka-python send callback)."""
+        with self._lock:
+            entry = self._in_flight.get(row_number)
+            if entry is not None:
+                entry[1] = True
+                self._advance()
+
+    def _advance(self) -> None:
+        position = None
+        while self._in_flight:
+            row_number, (byte_offset, done) = next(iter(self._in_flight.items()))
+            if not done:
+                break
+            self._in_flight.popitem(last=False)
+            position = (byte_offset, row_number)
+        if position is not None:
+            self.position = position
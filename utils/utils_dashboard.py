@@ -0,0 +1,294 @@
+"""
+utils_dashboard.py - serve live aggregates to many browser viewers.
+
+One consumer keeps the aggregates and publishes small deltas here.
+Every connected browser gets its own pending delta that is merged
+(coalesced) in place, and a per-client thread streams it out as
+Server-Sent Events (SSE). Publishing never waits on a client: a slow
+viewer simply receives fewer, larger updates, and a stuck viewer is
+dropped when its socket write times out.
+
+Uses only the Python Standard Library, so it runs entirely locally.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import functions from local modules
+from utils.utils_logger import logger
+
+#####################################
+# Default Configurations
+#####################################
+
+DEFAULT_DASHBOARD_HOST = "127.0.0.1"
+DEFAULT_DASHBOARD_PORT = 8050
+
+# Minimum seconds between two events sent to the same client
+DEFAULT_CLIENT_FLUSH_INTERVAL = 0.25
+
+# Seconds of silence before a keep-alive comment is sent
+KEEPALIVE_SECONDS = 15
+
+# Seconds a socket write may block before the client is dropped
+CLIENT_WRITE_TIMEOUT = 10
+
+#####################################
+# Delta Coalescing
+#####################################
+
+
+def merge_delta(target: dict, delta: dict) -> None:
+    """
+    Merge a delta into target in place.
+
+    Nested dicts are merged key by key, any other value replaces the
+    previous one, so repeated updates to the same key collapse to one.
+    """
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_delta(target[key], value)
+        elif isinstance(value, dict):
+            target[key] = dict(value)
+        else:
+            target[key] = value
+
+
+def finite_delta(delta: dict) -> dict:
+    """
+    Return a copy of a delta with NaN and infinite numbers replaced by None.
+
+    Python would write them as bare NaN/Infinity, which the browser's
+    JSON.parse rejects, so one bad aggregate would stop every viewer.
+    """
+    clean = {}
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            clean[key] = finite_delta(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            clean[key] = None
+        else:
+            clean[key] = value
+    return clean
+
+
+class DashboardClient:
+    """Pending coalesced delta for one connected viewer."""
+
+    def __init__(self, client_id: int, snapshot: dict):
+        self.client_id = client_id
+        self.pending = snapshot
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.ready.set()
+
+    def offer(self, delta: dict) -> None:
+        """Coalesce a delta into the pending update (never blocks on I/O)."""
+        with self.lock:
+            merge_delta(self.pending, delta)
+        self.ready.set()
+
+    def take(self) -> dict:
+        """Return and reset the pending update."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.ready.clear()
+        return pending
+
+
+class DashboardBroadcaster:
+    """Keep the full dashboard state and fan deltas out to all clients."""
+
+    def __init__(self):
+        self.state = {}
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def publish(self, delta: dict) -> None:
+        """Apply a delta to the state and queue it for every client."""
+        delta = finite_delta(delta)
+        with self._lock:
+            merge_delta(self.state, delta)
+            clients = list(self.clients.values())
+        for client in clients:
+            client.offer(delta)
+
+    def register(self) -> DashboardClient:
+        """Add a client whose first event is a full snapshot of the state."""
+        with self._lock:
+            self._next_id += 1
+            client = DashboardClient(self._next_id, json.loads(json.dumps(self.state)))
+            self.clients[client.client_id] = client
+        logger.info(f"Dashboard client {client.client_id} connected ({len(self.clients)} total).")
+        return client
+
+    def unregister(self, client: DashboardClient) -> None:
+        """Remove a client."""
+        with self._lock:
+            self.clients.pop(client.client_id, None)
+        logger.info(f"Dashboard client {client.client_id} disconnected ({len(self.clients)} total).")
+
+    def snapshot(self) -> dict:
+        """Return a copy of the full state."""
+        with self._lock:
+            return json.loads(json.dumps(self.state))
+
+
+#####################################
+# HTTP Server
+#####################################
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Food vs. Proteins - Live Dashboard</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+td, th { padding: 2px 10px; text-align: left; }
+.bar { background: steelblue; height: 12px; }
+</style>
+</head>
+<body>
+<h2>Food vs. Proteins - Live Dashboard</h2>
+<table id="stats"></table>
+<h3>Top foods by protein</h3>
+<table id="foods"></table>
+<script>
+const state = {};
+function merge(target, delta) {
+  for (const [key, value] of Object.entries(delta)) {
+    if (key === "__proto__") continue;  // keys come from the topic
+    if (value && typeof value === "object" && typeof target[key] === "object") {
+      merge(target[key], value);
+    } else {
+      target[key] = value;
+    }
+  }
+}
+function cell(tag, text) {
+  const element = document.createElement(tag);
+  element.textContent = text;
+  return element;
+}
+function render() {
+  // Values come from the topic, so build nodes with textContent (never innerHTML)
+  const statsRows = Object.entries(state.stats || {}).map(([k, v]) => {
+    const row = document.createElement("tr");
+    row.append(cell("th", k), cell("td", v));
+    return row;
+  });
+  document.getElementById("stats").replaceChildren(...statsRows);
+
+  const foods = Object.entries(state.foods || {}).sort((a, b) => b[1] - a[1]).slice(0, 20);
+  const top = foods.length ? Number(foods[0][1]) || 1 : 1;
+  const foodRows = foods.map(([k, v]) => {
+    const bar = document.createElement("div");
+    bar.className = "bar";
+    bar.style.width = `${Math.max(Math.round(300 * Number(v) / top), 0) || 0}px`;
+    const barCell = document.createElement("td");
+    barCell.append(bar);
+    const row = document.createElement("tr");
+    row.append(cell("td", k), cell("td", v), barCell);
+    return row;
+  });
+  document.getElementById("foods").replaceChildren(...foodRows);
+}
+const source = new EventSource("/events");
+source.onmessage = (event) => { merge(state, JSON.parse(event.data)); render(); };
+</script>
+</body>
+</html>
+"""
+
+
+def make_request_handler(broadcaster: DashboardBroadcaster, flush_interval: float):
+    """Build a request handler class bound to a broadcaster."""
+
+    class DashboardRequestHandler(BaseHTTPRequestHandler):
+        # Socket timeout, so a viewer that stops reading is dropped
+        timeout = CLIENT_WRITE_TIMEOUT
+
+        def log_message(self, format, *args):
+            logger.debug(f"Dashboard request: {format % args}")
+
+        def do_GET(self):
+            if self.path == "/":
+                self._send_body(DASHBOARD_PAGE.encode("utf-8"), "text/html; charset=utf-8")
+            elif self.path == "/snapshot":
+                body = json.dumps(broadcaster.snapshot(), allow_nan=False).encode("utf-8")
+                self._send_body(body, "application/json")
+            elif self.path == "/events":
+                self._stream_events()
+            else:
+                self.send_error(404)
+
+        def _send_body(self, body: bytes, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream_events(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            client = broadcaster.register()
+            try:
+                while True:
+                    if not client.ready.wait(KEEPALIVE_SECONDS):
+                        self.wfile.write(b": keep-alive\n\n")
+                        self.wfile.flush()
+                        continue
+                    delta = client.take()
+                    if delta:
+                        self.wfile.write(f"data: {json.dumps(delta, allow_nan=False)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    # Let further deltas coalesce before the next write
+                    time.sleep(flush_interval)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Dashboard client {client.client_id} stream ended: {e}")
+            finally:
+                broadcaster.unregister(client)
+
+    return DashboardRequestHandler
+
+
+def start_dashboard_server(
+    broadcaster: DashboardBroadcaster,
+    host: str = DEFAULT_DASHBOARD_HOST,
+    port: int = DEFAULT_DASHBOARD_PORT,
+    flush_interval: float = DEFAULT_CLIENT_FLUSH_INTERVAL,
+) -> ThreadingHTTPServer:
+    """
+    Start the dashboard HTTP server on a background thread.
+
+    Args:
+        broadcaster (DashboardBroadcaster): Source of state and deltas.
+        host (str): Interface to bind (localhost by default).
+        port (int): Port to listen on.
+        flush_interval (float): Minimum seconds between events per client.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it.
+    """
+    handler = make_request_handler(broadcaster, flush_interval)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(f"Dashboard server running at http://{host}:{port}/")
+    return server
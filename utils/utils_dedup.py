@@ -0,0 +1,164 @@
+"""
+utils_dedup.py - drop duplicate messages with bounded memory.
+
+Consumers start from the earliest offset and producers retry sends,
+so the same record can arrive more than once. These helpers give each
+record a fingerprint and remember recent fingerprints in Bloom filters:
+
+- fingerprint_record(): the producer-assigned sequence id ("seq"),
+  scoped to the record's "source", when present, otherwise a hash of
+  the raw message. A seq is only unique within one source.
+- BloomFilter: fixed-size bit array sized for a capacity and error rate.
+- RotatingBloomFilter: a current and a previous filter; the previous
+  one is dropped every window (or when the current one is full), so
+  memory stays fixed however long the consumer runs.
+
+A Bloom filter never misses a duplicate it remembers, but may rarely
+(at the configured error rate) drop a record it has not seen.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+import math
+import time
+import hashlib
+
+# Import functions from local modules
+from utils.utils_logger import logger
+
+#####################################
+# Default Configurations
+#####################################
+
+DEFAULT_DEDUP_WINDOW_SECONDS = 3600
+DEFAULT_DEDUP_CAPACITY = 100_000
+DEFAULT_DEDUP_ERROR_RATE = 0.001
+
+#####################################
+# Fingerprints
+#####################################
+
+
+def fingerprint_record(data: dict, raw_message: str) -> bytes:
+    """
+    Return a fingerprint for a record.
+
+    Args:
+        data (dict): The parsed message.
+        raw_message (str): The message as received.
+
+    Returns:
+        bytes: The source and sequence id if the producer assigned one,
+            else a content hash.
+    """
+    seq = data.get("seq")
+    if seq is not None:
+        return f"seq:{data.get('source')}:{seq}".encode("utf-8")
+    return hashlib.blake2b(raw_message.encode("utf-8"), digest_size=16).digest()
+
+
+#####################################
+# Bloom Filters
+#####################################
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(round(self.num_bits / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint: bytes):
+        digest = hashlib.blake2b(fingerprint, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(fingerprint))
+
+    def add(self, fingerprint: bytes) -> None:
+        """Add a fingerprint to the filter."""
+        for p in self._positions(fingerprint):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class RotatingBloomFilter:
+    """
+    Time-windowed duplicate filter made of two Bloom filters.
+
+    Fingerprints are remembered for at least one window and at most
+    two, and memory is fixed at two filters of `capacity` entries.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+        capacity: int = DEFAULT_DEDUP_CAPACITY,
+        error_rate: float = DEFAULT_DEDUP_ERROR_RATE,
+    ):
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.rotated_at = time.monotonic()
+        self.duplicates = 0
+
+    def _rotate_if_due(self) -> None:
+        now = time.monotonic()
+        if now - self.rotated_at >= self.window_seconds or self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = now
+            logger.debug("Deduplication filter rotated.")
+
+    def check_and_add(self, fingerprint: bytes) -> bool:
+        """
+        Remember a fingerprint and report whether it was seen before.
+
+        Returns:
+            bool: True if the fingerprint is a (probable) duplicate.
+        """
+        self._rotate_if_due()
+        if fingerprint in self.current:
+            self.duplicates += 1
+            return True
+        duplicate = fingerprint in self.previous
+        # Carry fingerprints from the previous window forward so they survive the next rotation
+        self.current.add(fingerprint)
+        if duplicate:
+            self.duplicates += 1
+        return duplicate
+
+
+#####################################
+# Create from .env Variables
+#####################################
+
+
+def get_dedup_enabled() -> bool:
+    """Fetch whether to drop duplicate messages (idempotent mode) from environment."""
+    enabled = os.getenv("SMOKER_DEDUP_ENABLED", "false").lower() in ("1", "true", "yes")
+    logger.info(f"Deduplication enabled: {enabled}")
+    return enabled
+
+
+def create_dedup_filter():
+    """Create a duplicate filter from environment settings, or None if disabled."""
+    if not get_dedup_enabled():
+        return None
+    window_seconds = float(os.getenv("SMOKER_DEDUP_WINDOW_SECONDS", DEFAULT_DEDUP_WINDOW_SECONDS))
+    capacity = int(os.getenv("SMOKER_DEDUP_CAPACITY", DEFAULT_DEDUP_CAPACITY))
+    logger.info(f"Deduplication window: {window_seconds} seconds, capacity: {capacity}")
+    return RotatingBloomFilter(window_seconds=window_seconds, capacity=capacity)
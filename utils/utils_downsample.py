@@ -0,0 +1,241 @@
+"""
+utils_downsample.py - level-of-detail helpers for live charts.
+
+Plotting every point of a long-running stream wastes render time and
+produces unreadable charts. These helpers reduce a series to roughly
+the pixel width of the chart while keeping its visual shape:
+
+- lttb(): Largest-Triangle-Three-Buckets, keeps the most visually
+  significant point per bucket.
+- minmax_decimate(): keeps the min and max of each bucket, so peaks
+  (e.g. protein spikes) are never lost.
+- MultiResolutionSeries: stores raw points plus min/max summaries at
+  coarser levels, maintained incrementally as points are appended,
+  so zoomed-out views of hours of data draw from a few hundred points.
+
+Points are (x, y) tuples with numeric x and y values.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import math
+
+#####################################
+# Default Configurations
+#####################################
+
+DEFAULT_LEVEL_FACTOR = 4
+DEFAULT_MAX_LEVELS = 8
+
+#####################################
+# Downsampling Functions
+#####################################
+
+
+def lttb(points: list, threshold: int) -> list:
+    """
+    Downsample points with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        points (list): (x, y) tuples sorted by x.
+        threshold (int): Maximum number of points to return.
+
+    Returns:
+        list: At most `threshold` points, always including the first and last.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index of the previously selected point
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_count = next_end - next_start
+        avg_x = sum(p[0] for p in points[next_start:next_end]) / next_count
+        avg_y = sum(p[1] for p in points[next_start:next_end]) / next_count
+
+        # Pick the point in this bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        max_area = -1.0
+        max_index = start
+        for j in range(start, end):
+            px, py = points[j]
+            area = abs((ax - avg_x) * (py - ay) - (ax - px) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                max_index = j
+
+        sampled.append(points[max_index])
+        a = max_index
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax_decimate(points: list, n_buckets: int) -> list:
+    """
+    Downsample points by keeping the min and max y value of each bucket.
+
+    Args:
+        points (list): (x, y) tuples sorted by x.
+        n_buckets (int): Number of buckets (usually the pixel width).
+
+    Returns:
+        list: At most 2 * n_buckets points, in x order.
+    """
+    n = len(points)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return list(points)
+
+    sampled = []
+    bucket_size = n / n_buckets
+    for i in range(n_buckets):
+        bucket = points[int(i * bucket_size):int((i + 1) * bucket_size)]
+        if not bucket:
+            continue
+        low = min(bucket, key=lambda p: p[1])
+        high = max(bucket, key=lambda p: p[1])
+        if low is high:
+            sampled.append(low)
+        elif low[0] <= high[0]:
+            sampled.extend((low, high))
+        else:
+            sampled.extend((high, low))
+    return sampled
+
+
+#####################################
+# Multi-Resolution Series
+#####################################
+
+
+class MultiResolutionSeries:
+    """
+    Append-only series with incrementally maintained min/max levels.
+
+    Level 0 holds the raw points. Each coarser level k summarizes
+    `factor ** k` raw points as a (min point, max point) pair, so a
+    query only touches the level whose size is close to the requested
+    number of points.
+    """
+
+    def __init__(self, factor: int = DEFAULT_LEVEL_FACTOR, max_levels: int = DEFAULT_MAX_LEVELS):
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+        self.factor = factor
+        self.max_levels = max_levels
+        self.raw = []
+        # levels[k - 1] holds completed (min, max) buckets for level k
+        self.levels = [[] for _ in range(max_levels)]
+        # Partially filled bucket for each level: [low, high, count]
+        self._pending = [None for _ in range(max_levels)]
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def clear(self) -> None:
+        """Remove all points from every level."""
+        self.raw.clear()
+        for level in self.levels:
+            level.clear()
+        self._pending = [None for _ in range(self.max_levels)]
+
+    def append(self, x: float, y: float) -> None:
+        """Append one point and update the coarser levels in O(levels)."""
+        point = (x, y)
+        self.raw.append(point)
+        self._push(0, point, point)
+
+    def extend(self, points) -> None:
+        """Append (x, y) points in order."""
+        for x, y in points:
+            self.append(x, y)
+
+    def _push(self, level: int, low: tuple, high: tuple) -> None:
+        """Merge a (low, high) summary into the pending bucket of a level."""
+        if level >= self.max_levels:
+            return
+        pending = self._pending[level]
+        if pending is None:
+            self._pending[level] = [low, high, 1]
+            pending = self._pending[level]
+        else:
+            if low[1] < pending[0][1]:
+                pending[0] = low
+            if high[1] > pending[1][1]:
+                pending[1] = high
+            pending[2] += 1
+
+        if pending[2] == self.factor:
+            self.levels[level].append((pending[0], pending[1]))
+            self._pending[level] = None
+            self._push(level + 1, pending[0], pending[1])
+
+    def _level_points(self, level: int) -> list:
+        """Flatten the buckets of a level (plus the newest raw points) to points."""
+        buckets = list(self.levels[level - 1])
+
+        # Raw points not yet summarized at this level (still pending in this
+        # or a finer level) are folded into one extra min/max bucket, so the
+        # newest peaks are never lost
+        tail = self.raw[len(buckets) * self.factor ** level:]
+        if tail:
+            buckets.append(
+                (min(tail, key=lambda p: p[1]), max(tail, key=lambda p: p[1]))
+            )
+
+        points = []
+        for low, high in buckets:
+            if low is high:
+                points.append(low)
+            elif low[0] <= high[0]:
+                points.extend((low, high))
+            else:
+                points.extend((high, low))
+        return points
+
+    def query(self, max_points: int, use_lttb: bool = False) -> list:
+        """
+        Return at most `max_points` points covering the whole series.
+
+        Args:
+            max_points (int): Point budget, e.g. the chart width in pixels.
+            use_lttb (bool): Apply LTTB to the chosen level instead of
+                min/max decimation for the final reduction.
+
+        Returns:
+            list: (x, y) tuples in x order.
+        """
+        if len(self.raw) <= max_points:
+            return list(self.raw)
+
+        # Each level-k bucket contributes up to 2 points
+        level = 0
+        points_at_level = len(self.raw)
+        while level < self.max_levels and points_at_level > max_points:
+            level += 1
+            points_at_level = 2 * math.ceil(len(self.raw) / (self.factor ** level))
+
+        # Use the finest level that is still larger than the budget
+        level = max(level - 1, 0)
+        points = self.raw if level == 0 else self._level_points(level)
+
+        if use_lttb:
+            sampled = lttb(points, max_points - 1)
+        else:
+            sampled = minmax_decimate(points, max((max_points - 1) // 2, 1))
+
+        # Keep the newest point so the chart always shows the latest value
+        if sampled[-1] is not self.raw[-1]:
+            sampled.append(self.raw[-1])
+        return sampled
@@ -0,0 +1,376 @@
+"""
+utils_microbatch.py - micro-batch processing with NumPy column arrays.
+
+Instead of handling one dict at a time, a consumer gathers up to N
+messages or T milliseconds of messages, decodes them into one NumPy
+array per numeric field and runs registered vectorized transforms
+over the whole batch:
+
+- poll_batches(): gather message values from a Kafka consumer.
+- decode_batch(): parse (and optionally validate and deduplicate) the
+  messages, writing each one straight into the column arrays
+  (missing values are NaN).
+- register_transform(): add a function that takes the columns and
+  returns one array for the whole batch. Stateful transforms also get
+  a dict the caller keeps between batches, so results such as z-scores
+  and the change from the previous reading do not restart every batch.
+
+Columns are built for the NUMERIC_FIELDS in the validator's schema (or,
+without one, that a batch actually carries), so the same code works for
+the food, social and smoker streams. Transform results stay on the
+batch (MicroBatch.results); publish_results() sends them downstream
+as one message per record.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import json
+import math
+import time
+
+# Import external packages
+import numpy as np
+
+# Import functions from local modules
+from utils.utils_dedup import fingerprint_record
+from utils.utils_logger import logger
+
+#####################################
+# Default Configurations
+#####################################
+
+DEFAULT_BATCH_MAX_RECORDS = 500
+DEFAULT_BATCH_MAX_MILLIS = 200
+
+# Numeric message fields decoded into column arrays
+NUMERIC_FIELDS = (
+    "Calories",
+    "Protein",
+    "Fat",
+    "Carbs",
+    "Fibre",
+    "sentiment",
+    "message_length",
+    "temperature",
+)
+
+# Grams of protein at or above which a food counts as high protein
+HIGH_PROTEIN_GRAMS = 20.0
+
+#####################################
+# Gather Batches
+#####################################
+
+
+def poll_batches(
+    consumer,
+    max_records: int = DEFAULT_BATCH_MAX_RECORDS,
+    max_millis: int = DEFAULT_BATCH_MAX_MILLIS,
+):
+    """
+    Gather message values from a Kafka consumer into micro-batches.
+
+    A batch is yielded when it holds max_records values or when
+    max_millis have passed since its first value arrived.
+
+    Yields:
+        list: Message values, in the order they were consumed.
+    """
+    batch = []
+    deadline = None
+    while True:
+        remaining_millis = max_millis
+        if deadline is not None:
+            remaining_millis = max(int((deadline - time.monotonic()) * 1000), 0)
+
+        polled = consumer.poll(
+            timeout_ms=remaining_millis, max_records=max_records - len(batch)
+        )
+        for partition_records in polled.values():
+            batch.extend(record.value for record in partition_records)
+
+        if batch and deadline is None:
+            deadline = time.monotonic() + max_millis / 1000
+        if batch and (len(batch) >= max_records or time.monotonic() >= deadline):
+            yield batch
+            batch = []
+            deadline = None
+
+
+#####################################
+# Decode Batches
+#####################################
+
+
+class MicroBatch:
+    """
+    One decoded micro-batch.
+
+    Attributes:
+        records (list): Accepted messages as dicts.
+        columns (dict): Field name -> float64 array aligned with records.
+        rejects (list): (raw message, reason code) for rejected messages.
+        duplicates (int): Messages dropped by the dedup filter.
+        results (dict): Transform name -> array, filled by run_transforms().
+    """
+
+    def __init__(self, records: list, columns: dict, rejects: list, duplicates: int):
+        self.records = records
+        self.columns = columns
+        self.rejects = rejects
+        self.duplicates = duplicates
+        self.results = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def _fill_row(values: np.ndarray, row: int, record: dict, fields: tuple) -> None:
+    """Write one record into column `row`, with NaN for missing or non-numeric values."""
+    try:
+        # Fast path: numbers and None (None becomes NaN)
+        values[:, row] = [record.get(field) for field in fields]
+    except (TypeError, ValueError):
+        for i, field in enumerate(fields):
+            try:
+                values[i, row] = float(record.get(field))
+            except (TypeError, ValueError):
+                values[i, row] = np.nan
+
+
+def decode_batch(
+    messages: list,
+    validator=None,
+    dedup_filter=None,
+    fields: tuple = NUMERIC_FIELDS,
+) -> MicroBatch:
+    """
+    Decode a batch of JSON messages into records and column arrays.
+
+    Each accepted record is written straight into a preallocated
+    (field x message) array while it is validated, so every record is
+    handled once and each column is a contiguous slice of that array.
+
+    Args:
+        messages (list): Raw JSON message strings.
+        validator (SchemaValidator, optional): Checks and coerces each record.
+        dedup_filter (RotatingBloomFilter, optional): Drops repeated records.
+        fields (tuple): Numeric fields to decode into columns.
+
+    Returns:
+        MicroBatch: The accepted records, their columns and the rejects.
+    """
+    # A validator fixes the fields of every clean record up front
+    if validator is not None:
+        fields = tuple(field for field in fields if field in validator.field_names)
+    values = np.full((len(fields), len(messages)), np.nan)
+
+    records = []
+    rejects = []
+    duplicates = 0
+    for message in messages:
+        if validator is not None:
+            record, reason = validator.validate_json(message)
+        else:
+            try:
+                record = json.loads(message)
+                reason = None if isinstance(record, dict) else "not_an_object"
+            except ValueError:
+                reason = "invalid_json"
+            if reason is not None:
+                record = None
+        if record is None:
+            rejects.append((message, reason))
+            continue
+        if dedup_filter is not None and dedup_filter.check_and_add(
+            fingerprint_record(record, message)
+        ):
+            duplicates += 1
+            continue
+        _fill_row(values, len(records), record, fields)
+        records.append(record)
+
+    values = values[:, :len(records)]
+    if validator is None:
+        # Without a schema, keep only the fields this stream actually carries
+        carried = ~np.all(np.isnan(values), axis=1)
+        columns = {field: values[i] for i, field in enumerate(fields) if carried[i]}
+    else:
+        columns = {field: values[i] for i, field in enumerate(fields)}
+    return MicroBatch(records, columns, rejects, duplicates)
+
+
+#####################################
+# Vectorized Transforms
+#####################################
+
+# Transform name -> (required fields, stateful, function)
+TRANSFORMS = {}
+
+
+def register_transform(name: str, requires: tuple = (), stateful: bool = False):
+    """
+    Register a vectorized transform, for use as a decorator.
+
+    The function receives the batch columns (field -> array) and returns
+    one array for the whole batch. It runs only when every field in
+    `requires` is present in the batch.
+
+    A stateful transform also receives a dict that it may update and
+    that is passed back on the next batch (see run_transforms()), so it
+    can carry values across batches, e.g. the previous reading.
+    """
+
+    def decorator(function):
+        TRANSFORMS[name] = (tuple(requires), stateful, function)
+        return function
+
+    return decorator
+
+
+def run_transforms(batch: MicroBatch, names: list = None, state: dict = None) -> dict:
+    """
+    Run registered transforms over a batch and store their results.
+
+    Args:
+        batch (MicroBatch): A decoded batch.
+        names (list, optional): Transforms to run. Defaults to all registered.
+        state (dict, optional): Transform name -> state, kept by the caller
+            across batches. Without it, stateful transforms only see the
+            current batch.
+
+    Returns:
+        dict: Transform name -> result array.
+    """
+    if not batch.records:
+        return batch.results
+    if state is None:
+        state = {}
+    for name in names or list(TRANSFORMS):
+        requires, stateful, function = TRANSFORMS[name]
+        if not all(field in batch.columns for field in requires):
+            continue
+        try:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if stateful:
+                    batch.results[name] = function(batch.columns, state.setdefault(name, {}))
+                else:
+                    batch.results[name] = function(batch.columns)
+        except Exception as e:
+            logger.error(f"Transform '{name}' failed on a batch of {len(batch)}: {e}")
+    return batch.results
+
+
+def _running_zscore(values: np.ndarray, state: dict) -> np.ndarray:
+    """
+    Z-score against every value seen so far, ignoring NaN.
+
+    The count, mean and sum of squared deviations are merged batch by
+    batch (Chan et al.), so one-record batches still get a score once
+    two values have been seen.
+    """
+    valid = values[~np.isnan(values)]
+    if valid.size:
+        count, mean, m2 = state.get("count", 0), state.get("mean", 0.0), state.get("m2", 0.0)
+        batch_mean = valid.mean()
+        delta = batch_mean - mean
+        total = count + valid.size
+        state["mean"] = mean + delta * valid.size / total
+        state["m2"] = m2 + np.sum((valid - batch_mean) ** 2) + delta ** 2 * count * valid.size / total
+        state["count"] = total
+    if state.get("count", 0) < 2:
+        return np.full(values.shape, np.nan)
+    std = np.sqrt(state["m2"] / state["count"])
+    if std == 0:
+        return np.zeros(values.shape)
+    return (values - state["mean"]) / std
+
+
+@register_transform("protein_calorie_ratio", requires=("Protein", "Calories"))
+def protein_calorie_ratio(columns: dict) -> np.ndarray:
+    """Share of calories that come from protein (4 kcal per gram)."""
+    ratio = columns["Protein"] * 4.0 / columns["Calories"]
+    ratio[~np.isfinite(ratio)] = np.nan
+    return ratio
+
+
+@register_transform("protein_zscore", requires=("Protein",), stateful=True)
+def protein_zscore(columns: dict, state: dict) -> np.ndarray:
+    """Protein z-score against all foods so far."""
+    return _running_zscore(columns["Protein"], state)
+
+
+@register_transform("high_protein", requires=("Protein",))
+def high_protein(columns: dict) -> np.ndarray:
+    """True where a food has at least HIGH_PROTEIN_GRAMS of protein."""
+    return columns["Protein"] >= HIGH_PROTEIN_GRAMS
+
+
+@register_transform("sentiment_zscore", requires=("sentiment",), stateful=True)
+def sentiment_zscore(columns: dict, state: dict) -> np.ndarray:
+    """Sentiment z-score against all messages so far."""
+    return _running_zscore(columns["sentiment"], state)
+
+
+@register_transform("temperature_change", requires=("temperature",), stateful=True)
+def temperature_change(columns: dict, state: dict) -> np.ndarray:
+    """Change from the previous reading, including the last one of the previous batch."""
+    temperature = columns["temperature"]
+    change = np.diff(temperature, prepend=state.get("last", np.nan))
+    readings = temperature[~np.isnan(temperature)]
+    if readings.size:
+        state["last"] = readings[-1]
+    return change
+
+
+#####################################
+# Publish Results
+#####################################
+
+
+def result_rows(batch: MicroBatch, key_fields: tuple = ("source", "seq")) -> list:
+    """
+    Turn the transform results of a batch into one dict per record.
+
+    Each dict holds the record's key fields and every transform result
+    for it (NaN and infinite values become None, so it is valid JSON).
+    """
+    if not batch.results:
+        return []
+    names = list(batch.results)
+    columns = [
+        [value if not isinstance(value, float) or math.isfinite(value) else None for value in values.tolist()]
+        for values in batch.results.values()
+    ]
+    rows = []
+    for record, values in zip(batch.records, zip(*columns)):
+        row = {field: record.get(field) for field in key_fields}
+        row.update(zip(names, values))
+        rows.append(row)
+    return rows
+
+
+def publish_results(producer, topic: str, batch: MicroBatch, key_fields: tuple = ("source", "seq")) -> int:
+    """
+    Send the per-record transform results of a batch to a Kafka topic.
+
+    Args:
+        producer (KafkaProducer): Producer with a JSON value serializer.
+        topic (str): Results topic.
+        batch (MicroBatch): A batch that run_transforms() has processed.
+        key_fields (tuple): Record fields that identify each result.
+
+    Returns:
+        int: Number of result messages sent.
+    """
+    rows = result_rows(batch, key_fields)
+    try:
+        for row in rows:
+            producer.send(topic, value=row)
+    except Exception as e:
+        logger.error(f"Failed to send {len(rows)} results to '{topic}': {e}")
+        return 0
+    return len(rows)
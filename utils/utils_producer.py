@@ -155,11 +155,14 @@ def create_kafka_producer(value_serializer=None):
         return None
 
 
-def create_kafka_topic(topic_name, group_id=None):
+def create_kafka_topic(topic_name, group_id=None, clear_existing=False):
     """
-    Create a fresh Kafka topic with the given name.
+    Create a Kafka topic with the given name if it does not exist.
+
     Args:
         topic_name (str): Name of the Kafka topic.
+        group_id (str): Consumer group ID used when clearing the topic.
+        clear_existing (bool): Clear out an existing topic (opt-in).
     """
     kafka_broker = get_kafka_broker_address()
 
@@ -168,10 +171,13 @@ def create_kafka_topic(topic_name, group_id=None):
 
         # Check if the topic exists
         topics = admin_client.list_topics()
-        if topic_name in topics:
+        if topic_name in topics and clear_existing:
             logger.info(f"Topic '{topic_name}' already exists. Clearing it out...")
             clear_kafka_topic(topic_name, group_id)
 
+        elif topic_name in topics:
+            logger.info(f"Topic '{topic_name}' already exists. Keeping its messages.")
+
         else:
             logger.info(f"Creating '{topic_name}'.")
             new_topic = NewTopic(
@@ -257,7 +263,7 @@ def main():
         sys.exit(2)
 
     logger.info("All services are ready. Proceed with producer setup.")
-    create_kafka_topic("test_topic", "default_group")
+    create_kafka_topic("test_topic", "default_group", clear_existing=True)
 
 
 #####################################
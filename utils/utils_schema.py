@@ -0,0 +1,302 @@
+"""
+utils_schema.py - compiled message schemas and a dead-letter queue.
+
+Each stream has a schema: a list of (field, type, required) entries.
+A schema is compiled once into a SchemaValidator, which checks and
+coerces a record in a single pass (e.g. "296" -> 296, "" -> None for
+optional fields) and returns a reason code instead of raising or
+logging when a record is rejected.
+
+Rejected records are counted per reason and can be handed to a
+DeadLetterQueue, which sends them in batches to a dead-letter topic
+(by default "<topic>_dlq"), so bad data costs a counter increment
+instead of an error log line.
+
+Reason codes:
+- invalid_json: the message is not valid JSON.
+- not_an_object: the message is JSON but not an object.
+- missing:<field>: a required field is absent or blank.
+- bad_type:<field>: a field cannot be coerced to its type (NaN and
+  infinite numbers count as bad types).
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+import json
+import math
+import time
+from collections import Counter
+from datetime import datetime
+
+# Import functions from local modules
+from utils.utils_producer import create_kafka_producer
+from utils.utils_logger import logger
+
+#####################################
+# Schemas
+#####################################
+
+# Food messages, as sent by the food producer
+FOOD_SCHEMA = [
+    ("source", str, False),
+    ("seq", int, False),
+    ("timestamp", str, False),
+    ("Food", str, True),
+    ("Calories", int, True),
+    ("Protein", float, False),
+    ("Fat", float, False),
+    ("Carbs", float, False),
+    ("Fibre", float, False),
+]
+
+# Social messages, as in project_live.json
+PROJECT_SCHEMA = [
+    ("message", str, True),
+    ("author", str, True),
+    ("timestamp", str, True),
+    ("category", str, True),
+    ("sentiment", float, True),
+    ("keyword_mentioned", str, False),
+    ("message_length", int, False),
+]
+
+# Smoker temperature readings, as in smoker_temps.csv
+SMOKER_SCHEMA = [
+    ("timestamp", str, True),
+    ("temperature", float, True),
+]
+
+SCHEMAS = {
+    "food": FOOD_SCHEMA,
+    "project": PROJECT_SCHEMA,
+    "smoker": SMOKER_SCHEMA,
+}
+
+DEFAULT_DLQ_BATCH_SIZE = 100
+DEFAULT_DLQ_FLUSH_SECONDS = 5.0
+
+#####################################
+# Type Coercion
+#####################################
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, float):
+        raise ValueError(value)
+    if isinstance(value, str) and "." in value:
+        return _to_int(float(value))
+    if isinstance(value, str):
+        return int(value)
+    raise TypeError(type(value).__name__)
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise TypeError("bool")
+    number = float(value)
+    # "nan", "inf" and "1e999" parse, but would poison every aggregate downstream
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    raise TypeError(type(value).__name__)
+
+
+COERCERS = {
+    int: _to_int,
+    float: _to_float,
+    str: _to_str,
+}
+
+#####################################
+# Compiled Validators
+#####################################
+
+
+class SchemaValidator:
+    """
+    A schema compiled into a single-pass validator with rejection counters.
+
+    Attributes:
+        field_names (tuple): Fields of a clean record, in schema order.
+        accepted (int): Number of records that passed.
+        rejections (Counter): Number of rejected records per reason code.
+    """
+
+    def __init__(self, name: str, schema: list):
+        self.name = name
+        self.field_names = tuple(field for field, _, _ in schema)
+        # Resolve coercers and reason codes once, not per record
+        self._fields = tuple(
+            (field, COERCERS[field_type], required, f"missing:{field}", f"bad_type:{field}")
+            for field, field_type, required in schema
+        )
+        self.accepted = 0
+        self.rejections = Counter()
+
+    def validate(self, data) -> tuple:
+        """
+        Check and coerce one record.
+
+        Returns:
+            tuple: (clean record, None) if valid, else (None, reason code).
+        """
+        if not isinstance(data, dict):
+            self.rejections["not_an_object"] += 1
+            return None, "not_an_object"
+
+        record = {}
+        for field, coerce, required, missing_reason, bad_type_reason in self._fields:
+            value = data.get(field)
+            if value is None or value == "":
+                if required:
+                    self.rejections[missing_reason] += 1
+                    return None, missing_reason
+                record[field] = None
+                continue
+            try:
+                record[field] = coerce(value)
+            except (TypeError, ValueError):
+                self.rejections[bad_type_reason] += 1
+                return None, bad_type_reason
+
+        self.accepted += 1
+        return record, None
+
+    def validate_json(self, message: str) -> tuple:
+        """Parse a JSON message and validate it, see validate()."""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            self.rejections["invalid_json"] += 1
+            return None, "invalid_json"
+        return self.validate(data)
+
+    def rejected(self) -> int:
+        """Return the total number of rejected records."""
+        return sum(self.rejections.values())
+
+    def log_counters(self) -> None:
+        """Log the accepted and rejected counts."""
+        logger.info(
+            f"Schema '{self.name}': {self.accepted} accepted, {self.rejected()} rejected "
+            f"{dict(self.rejections)}."
+        )
+
+
+_validators = {}
+
+
+def get_validator(schema_name: str) -> SchemaValidator:
+    """Return the compiled validator for a schema, compiling it on first use."""
+    if schema_name not in _validators:
+        _validators[schema_name] = SchemaValidator(schema_name, SCHEMAS[schema_name])
+        logger.info(f"Compiled schema '{schema_name}'.")
+    return _validators[schema_name]
+
+
+#####################################
+# Dead-Letter Queue
+#####################################
+
+
+class DeadLetterQueue:
+    """
+    Collect rejected records and send them in batches to a dead-letter topic.
+
+    Each batch is one message:
+    {'source_topic': ..., 'timestamp': ..., 'records': [{'reason': ..., 'raw': ...}]}
+    """
+
+    def __init__(
+        self,
+        producer,
+        source_topic: str,
+        dlq_topic: str = None,
+        batch_size: int = DEFAULT_DLQ_BATCH_SIZE,
+        flush_seconds: float = DEFAULT_DLQ_FLUSH_SECONDS,
+    ):
+        """
+        Args:
+            producer (KafkaProducer): Producer with a JSON value serializer,
+                or None to only count rejects.
+            source_topic (str): Topic the records were read from or meant for.
+            dlq_topic (str): Dead-letter topic. Defaults to '<source_topic>_dlq'.
+            batch_size (int): Send when this many records are waiting.
+            flush_seconds (float): Send when the oldest waiting record is this old.
+        """
+        self.producer = producer
+        self.source_topic = source_topic
+        self.dlq_topic = dlq_topic or f"{source_topic}_dlq"
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.batch = []
+        self.first_added = None
+        self.sent = 0
+
+    def add(self, raw, reason: str) -> None:
+        """Queue a rejected record; sends the batch when it is full or old enough."""
+        if not self.batch:
+            self.first_added = time.monotonic()
+        self.batch.append({"reason": reason, "raw": raw})
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        """Send the waiting records if the oldest one is flush_seconds old."""
+        if self.batch and time.monotonic() - self.first_added >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send any waiting records to the dead-letter topic."""
+        if not self.batch:
+            return
+        if self.producer is not None:
+            try:
+                self.producer.send(
+                    self.dlq_topic,
+                    value={
+                        "source_topic": self.source_topic,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "records": self.batch,
+                    },
+                )
+                self.sent += len(self.batch)
+            except Exception as e:
+                logger.error(f"Failed to send {len(self.batch)} records to '{self.dlq_topic}': {e}")
+        self.batch = []
+
+
+def create_dead_letter_queue(topic: str, producer=None) -> DeadLetterQueue:
+    """
+    Create the dead-letter queue for rejected messages from environment settings.
+
+    Args:
+        topic (str): Topic the records were read from or meant for.
+        producer (KafkaProducer, optional): Existing producer with a JSON
+            value serializer to share. By default a new one is created.
+    """
+    dlq_topic = os.getenv("SMOKER_DLQ_TOPIC") or f"{topic}_dlq"
+    batch_size = int(os.getenv("SMOKER_DLQ_BATCH_SIZE", DEFAULT_DLQ_BATCH_SIZE))
+    logger.info(f"Dead-letter topic: {dlq_topic} (batches of {batch_size})")
+    if producer is None:
+        producer = create_kafka_producer(
+            value_serializer=lambda x: json.dumps(x).encode("utf-8")
+        )
+    if not producer:
+        logger.warning("No dead-letter producer. Rejected messages will only be counted.")
+    return DeadLetterQueue(producer, topic, dlq_topic=dlq_topic, batch_size=batch_size)